@@ -1,15 +1,17 @@
 import streamlit as st
 import requests
-import pandas as pd
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from contextlib import contextmanager
 import json
 import hashlib
+import orjson
 
 # ============================================================
 # CONFIG
 # ============================================================
-BACKEND_URL = "http://localhost:8000/generate"
-CHAT_URL = "http://localhost:8000/chat"
+GENERATE_STREAM_URL = "http://localhost:8000/generate/stream"
+CHAT_STREAM_URL = "http://localhost:8000/chat/stream"
 
 st.set_page_config(page_title="FinancAI", page_icon="💰", layout="centered")
 
@@ -27,7 +29,7 @@ st.markdown(
         box-shadow: 0px 0px 10px rgba(0,0,0,0.06);
         margin-bottom: 20px;
     }
-    .stButton > button {
+    .stButton > button, .stFormSubmitButton > button {
         background-color: #4CAF50;
         color: white;
         padding: 0.7rem 1.6rem;
@@ -35,7 +37,7 @@ st.markdown(
         border: none;
         font-size: 17px;
     }
-    .stButton > button:hover {
+    .stButton > button:hover, .stFormSubmitButton > button:hover {
         background-color: #45a049;
     }
     .disclaimer {
@@ -65,31 +67,70 @@ def clean_llm_text(text: str) -> str:
     """Remove formatting that looks bad in Streamlit (inline code + blockquotes)."""
     if not text:
         return ""
-    text = text.replace("`", "")
-    text = text.replace("\n> ", "\n").replace("> ", "")
-    return text
+    # Removing every "> " also covers the ones at line starts, so one pass per marker is enough
+    return text.replace("`", "").replace("> ", "")
 
 
 def strip_visual_from_financial_data(financial_data):
     """Remove allocation_visual so chatbot doesn't repeat/mangle it."""
-    try:
-        if not isinstance(financial_data, dict):
-            return financial_data
-        fd = dict(financial_data)
-        inv = fd.get("investing")
-        if isinstance(inv, dict):
-            inv2 = dict(inv)
-            inv2.pop("allocation_visual", None)
-            fd["investing"] = inv2
-        return fd
-    except Exception:
+    if not isinstance(financial_data, dict):
+        return financial_data
+    inv = financial_data.get("investing")
+    # Nothing to strip: hand the plan back as is, without copying it
+    if not (isinstance(inv, dict) and "allocation_visual" in inv):
         return financial_data
+    return {**financial_data, "investing": {k: v for k, v in inv.items() if k != "allocation_visual"}}
 
 
 def make_fingerprint(payload: dict) -> str:
     """Stable fingerprint to reset chat when plan changes."""
-    s = json.dumps(payload, sort_keys=True, ensure_ascii=False)
-    return hashlib.sha256(s.encode("utf-8")).hexdigest()
+    blob = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+    return hashlib.sha256(blob, usedforsecurity=False).hexdigest()
+
+
+@st.cache_resource
+def http_session() -> requests.Session:
+    """Keep-alive session shared across reruns, so each request skips the TCP handshake."""
+    session = requests.Session()
+    # Bodies are sent pre-encoded with orjson (data=...), so the JSON header is set once here
+    session.headers["Content-Type"] = "application/json"
+    # One cached session serves every browser tab, so allow a connection per concurrent request
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=Retry(total=2, backoff_factor=0.1))
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def iter_sse(res: requests.Response):
+    """Yield (event, data) pairs from a streamed Server-Sent Events response."""
+    res.encoding = "utf-8"
+    event, data = "message", []
+    try:
+        for line in res.iter_lines(decode_unicode=True):
+            if not line:
+                if data:
+                    yield event, json.loads("\n".join(data))
+                event, data = "message", []
+            elif line.startswith("event:"):
+                event = line[6:].strip()
+            elif line.startswith("data:"):
+                data.append(line[5:].lstrip())
+    finally:
+        res.close()
+
+
+def stream_tokens(events):
+    """Yield the text chunks of a /generate/stream or /chat/stream response until "done"."""
+    try:
+        for event, data in events:
+            if event == "token":
+                yield clean_llm_text(data)
+            elif event == "done":
+                break
+    except requests.RequestException as e:
+        yield f"\n\n(The response stream was interrupted: {e})"
+    finally:
+        events.close()
 
 
 def fmt_money(x, currency_label: str):
@@ -132,11 +173,11 @@ st.info(DISCLAIMER_TEXT)
 with section_box():
     st.header("📋 Financial Inputs")
 
+    # Widgets that change which inputs are shown stay outside the form,
+    # so toggling them still re-renders the page immediately.
     left, right = st.columns(2)
 
     with left:
-        country = st.text_input("Enter Country of Residence", key="country")
-
         currency_choice = st.selectbox(
             "Currency",
             ["USD ($)", "EUR (€)", "GBP (£)", "CAD ($)", "AUD ($)", "JPY (¥)", "INR (₹)", "Other"],
@@ -148,88 +189,101 @@ with section_box():
 
         currency_label = other_currency if currency_choice == "Other" else currency_choice
 
-        income = st.number_input(f"Monthly Income {currency_label}", min_value=0.0, step=100.0, key="income")
-
-        # ---------------------------
-        # FIXED EXPENSES (breakdown)
-        # ---------------------------
-        st.subheader("🏠 Fixed Expenses")
-        fixed_categories = ["Rent", "Utilities", "Transportation", "Insurance", "Phone", "Internet", "Other"]
-        fixed_items = []
-
         fixed_count = st.number_input(
             "Number of Fixed Expenses", min_value=0, max_value=20, value=0, step=1, key="fixed_count"
         )
-
-        for i in range(int(fixed_count)):
-            colA, colB = st.columns(2)
-            cat = colA.selectbox(f"Category {i+1}", fixed_categories, key=f"fcat{i}")
-            amt = colB.number_input(f"Amount {i+1} {currency_label}", min_value=0.0, step=10.0, key=f"famt{i}")
-            fixed_items.append({"name": cat, "amount": float(amt)})
-
-        fixed_total = sum(x["amount"] for x in fixed_items)
-
-        # ---------------------------
-        # VARIABLE EXPENSES (breakdown)
-        # ---------------------------
-        st.subheader("🛒 Variable Expenses")
-        variable_categories = [
-            "Groceries", "Hobbies", "Entertainment", "Subscriptions",
-            "Type Other Variable Here (e.g. Smoking, Coffee, Eating Out)"
-        ]
-        variable_items = []
-
         var_count = st.number_input(
             "Number of Variable Expenses", min_value=0, max_value=20, value=0, step=1, key="var_count"
         )
 
-        for i in range(int(var_count)):
-            colA, colB = st.columns(2)
-            cat = colA.selectbox(f"Category {i+1}", variable_categories, key=f"vcat{i}")
-            amt = colB.number_input(f"Amount {i+1} {currency_label}", min_value=0.0, step=10.0, key=f"vamt{i}")
-            variable_items.append({"name": cat, "amount": float(amt)})
+    with right:
+        enable_goal = st.checkbox("I have a savings goal", key="enable_goal")
+        use_months = False
+        if enable_goal:
+            use_months = st.checkbox("I have a target timeframe (months)", value=False, key="use_goal_months")
 
-        variable_total = sum(x["amount"] for x in variable_items)
+    # Everything else is batched in a form: editing a field does not rerun
+    # the script, only the submit button does.
+    with st.form("financial_inputs", clear_on_submit=False):
+        left, right = st.columns(2)
+
+        with left:
+            country = st.text_input("Enter Country of Residence", key="country")
+
+            income = st.number_input(f"Monthly Income {currency_label}", min_value=0.0, step=100.0, key="income")
+
+            # ---------------------------
+            # FIXED EXPENSES (breakdown)
+            # ---------------------------
+            st.subheader("🏠 Fixed Expenses")
+            fixed_categories = ["Rent", "Utilities", "Transportation", "Insurance", "Phone", "Internet", "Other"]
+            fixed_amounts = []  # only the total is sent, so no per-row dicts
+
+            for i in range(int(fixed_count)):
+                colA, colB = st.columns(2)
+                colA.selectbox(f"Category {i+1}", fixed_categories, key=f"fcat{i}")
+                amt = colB.number_input(f"Amount {i+1} {currency_label}", min_value=0.0, step=10.0, key=f"famt{i}")
+                fixed_amounts.append(float(amt))
+
+            # ---------------------------
+            # VARIABLE EXPENSES (breakdown)
+            # ---------------------------
+            st.subheader("🛒 Variable Expenses")
+            variable_categories = [
+                "Groceries", "Hobbies", "Entertainment", "Subscriptions",
+                "Type Other Variable Here (e.g. Smoking, Coffee, Eating Out)"
+            ]
+            variable_items = []
+
+            for i in range(int(var_count)):
+                colA, colB = st.columns(2)
+                cat = colA.selectbox(f"Category {i+1}", variable_categories, key=f"vcat{i}")
+                amt = colB.number_input(f"Amount {i+1} {currency_label}", min_value=0.0, step=10.0, key=f"vamt{i}")
+                variable_items.append({"name": cat, "amount": float(amt)})
+
+            # ---------------------------
+            # OPTIONAL SAVINGS GOAL (months optional)
+            # ---------------------------
+            goal_name = ""
+            goal_amount = 0.0
+            goal_months = None  # optional
+            if enable_goal:
+                st.subheader("🎯 Optional Savings Goal")
+                goal_name = st.text_input("What are you saving for? (optional)", key="goal_name")
+                goal_amount = st.number_input(
+                    f"Goal amount {currency_label}", min_value=0.0, step=50.0, key="goal_amount"
+                )
 
-        # ---------------------------
-        # OPTIONAL SAVINGS GOAL (months optional)
-        # ---------------------------
-        st.subheader("🎯 Optional Savings Goal")
-        enable_goal = st.checkbox("I have a savings goal", key="enable_goal")
+                if use_months:
+                    goal_months = st.number_input(
+                        "Target months to reach it", min_value=1, max_value=120, step=1, key="goal_months"
+                    )
 
-        goal_name = ""
-        goal_amount = 0.0
-        goal_months = None  # optional
-        if enable_goal:
-            goal_name = st.text_input("What are you saving for? (optional)", key="goal_name")
-            goal_amount = st.number_input(
-                f"Goal amount {currency_label}", min_value=0.0, step=50.0, key="goal_amount"
+        with right:
+            st.subheader("💳 Debt")
+            monthly_debt = st.number_input(
+                f"Monthly Debt Payments {currency_label}", min_value=0.0, step=10.0, key="monthly_debt"
             )
+            total_debt = st.number_input(f"Total Debt {currency_label}", min_value=0.0, step=100.0, key="total_debt")
 
-            use_months = st.checkbox("I have a target timeframe (months)", value=False, key="use_goal_months")
-            if use_months:
-                goal_months = st.number_input(
-                    "Target months to reach it", min_value=1, max_value=120, step=1, key="goal_months"
-                )
+            st.subheader("💵 Savings")
+            monthly_savings = st.number_input(
+                f"Monthly Savings {currency_label}", min_value=0.0, step=10.0, key="monthly_savings"
+            )
+            total_savings = st.number_input(
+                f"Total Savings {currency_label}", min_value=0.0, step=100.0, key="total_savings"
+            )
 
-    with right:
-        st.subheader("💳 Debt")
-        monthly_debt = st.number_input(
-            f"Monthly Debt Payments {currency_label}", min_value=0.0, step=10.0, key="monthly_debt"
-        )
-        total_debt = st.number_input(f"Total Debt {currency_label}", min_value=0.0, step=100.0, key="total_debt")
+        budget_type = st.radio("Budget Style", ["Super", "Normal", "Relaxed"], key="budget_type")
 
-        st.subheader("💵 Savings")
-        monthly_savings = st.number_input(
-            f"Monthly Savings {currency_label}", min_value=0.0, step=10.0, key="monthly_savings"
-        )
-        total_savings = st.number_input(
-            f"Total Savings {currency_label}", min_value=0.0, step=100.0, key="total_savings"
-        )
+        submitted = st.form_submit_button("✨ Generate Budget Plan", key="generate_btn")
 
-    budget_type = st.radio("Budget Style", ["Super", "Normal", "Relaxed"], key="budget_type")
+    plan_events = None
+    if submitted:
+        # Totals only feed the request, so they're summed on submit rather than on every rerun
+        fixed_total = sum(fixed_amounts)
+        variable_total = sum([x["amount"] for x in variable_items])
 
-    if st.button("✨ Generate Budget Plan", key="generate_btn"):
         payload = {
             "currency": currency_label,
             "country": country if country.strip() else None,
@@ -256,9 +310,14 @@ with section_box():
         new_fp = make_fingerprint(payload)
 
         try:
-            res = requests.post(BACKEND_URL, json=payload, timeout=30)
+            res = http_session().post(GENERATE_STREAM_URL, data=orjson.dumps(payload), stream=True, timeout=30)
             res.raise_for_status()
-            data = res.json()
+
+            # The plan arrives first; the explanation is streamed in below, under the results
+            plan_events = iter_sse(res)
+            event, data = next(plan_events)
+            if event != "plan":
+                raise ValueError(f"unexpected '{event}' event from backend")
 
             st.session_state.results = data
             st.session_state.latest_financial_data = data
@@ -271,6 +330,7 @@ with section_box():
 
             st.success("Your budget plan is ready! Scroll down 👇")
         except Exception as e:
+            plan_events = None
             st.error(f"Failed to connect to backend: {e}")
 
 # ============================================================
@@ -303,7 +363,8 @@ if st.session_state.results:
     with section_box():
         st.header("📌 Your Budget Plan")
 
-        df_totals = pd.DataFrame(
+        # st.table takes a dict of columns directly, no DataFrame needed
+        st.table(
             {
                 "Category": [
                     "Income", "Fixed Expenses", "Debt Payments",
@@ -319,7 +380,6 @@ if st.session_state.results:
                 ],
             }
         )
-        st.table(df_totals)
 
        # ======================================================
         # ✅ SAVINGS GOAL (deterministic display, months optional)
@@ -363,13 +423,12 @@ if st.session_state.results:
                     st.write(f"- {n}")
 
         st.subheader("Adjustments Suggested")
-        df_deltas = pd.DataFrame(
+        st.table(
             {
                 "Category": ["Savings Change", "Variable Spending Change"],
                 "Amount": [deltas.get("savings_change", 0), deltas.get("variable_change", 0)],
             }
         )
-        st.table(df_deltas)
 
         st.caption(
             f"Mode: {budget.get('mode', 'normal')} | "
@@ -412,7 +471,11 @@ if st.session_state.results:
     # ---------------------------
     # LLM EXPLANATION (language only; numbers must come from backend)
     # ---------------------------
-    if results.get("llm_explanation"):
+    if plan_events is not None:
+        with section_box():
+            st.header("✅ Personalized Advice")
+            results["llm_explanation"] = st.write_stream(stream_tokens(plan_events))
+    elif results.get("llm_explanation"):
         with section_box():
             st.header("✅ Personalized Advice")
             st.markdown(clean_llm_text(results["llm_explanation"]))
@@ -424,29 +487,46 @@ st.divider()
 st.header("🤖 AI Chatbot")
 st.caption(DISCLAIMER_TEXT)
 
+# Messages are cleaned once when appended ("_clean"), not on every rerun
 for msg in st.session_state.messages:
-    st.chat_message(msg["role"]).markdown(clean_llm_text(msg["content"]))
+    st.chat_message(msg["role"]).markdown(msg.get("_clean") or clean_llm_text(msg["content"]))
 
 user_message = st.chat_input("Ask something like: 'How can I improve my savings rate?'")
 
 if user_message:
-    st.session_state.messages.append({"role": "user", "content": user_message})
-
-    safe_financial_data = strip_visual_from_financial_data(st.session_state.latest_financial_data)
+    st.session_state.messages.append(
+        {"role": "user", "content": user_message, "_clean": clean_llm_text(user_message)}
+    )
+    st.chat_message("user").markdown(st.session_state.messages[-1]["_clean"])
+
+    # Strip the plan once per plan_id, not on every chat turn
+    cached_ctx = st.session_state.get("_chat_ctx")
+    if cached_ctx is not None and cached_ctx[0] == st.session_state.plan_id:
+        safe_financial_data = cached_ctx[1]
+    else:
+        safe_financial_data = strip_visual_from_financial_data(st.session_state.latest_financial_data)
+        st.session_state["_chat_ctx"] = (st.session_state.plan_id, safe_financial_data)
 
     payload = {
         "message": user_message,
         "financial_data": safe_financial_data,
-        "history": st.session_state.messages,
+        "history": [{"role": m["role"], "content": m["content"]} for m in st.session_state.messages],
         "plan_id": st.session_state.plan_id,
     }
 
-    try:
-        res = requests.post(CHAT_URL, json=payload, timeout=30)
-        res.raise_for_status()
-        ai_response = res.json().get("response", "No response received.")
-    except Exception as e:
-        ai_response = f"Error connecting to backend: {e}"
-
-    st.session_state.messages.append({"role": "assistant", "content": ai_response})
-    st.rerun()
+    # The reply is rendered as it streams in; both bubbles are already on screen, so no rerun
+    with st.chat_message("assistant"):
+        try:
+            res = http_session().post(CHAT_STREAM_URL, data=orjson.dumps(payload), stream=True, timeout=30)
+            res.raise_for_status()
+            ai_response = st.write_stream(stream_tokens(iter_sse(res)))
+        except Exception as e:
+            ai_response = f"Error connecting to backend: {e}"
+            st.markdown(ai_response)
+        if not ai_response:
+            ai_response = "No response received."
+            st.markdown(ai_response)
+
+    st.session_state.messages.append(
+        {"role": "assistant", "content": ai_response, "_clean": clean_llm_text(ai_response)}
+    )
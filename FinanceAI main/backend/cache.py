@@ -0,0 +1,74 @@
+# backend/cache.py
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+import orjson
+
+
+def round_floats(obj: Any) -> Any:
+    """
+    Copy of a JSON-like payload with floats rounded to 2 decimals (recursively),
+    so semantically identical payloads produce the same key / the same prompt.
+    """
+    if isinstance(obj, float):
+        return round(obj, 2)
+    if isinstance(obj, dict):
+        return {str(k): round_floats(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [round_floats(v) for v in obj]
+    return obj
+
+
+def payload_key(obj: Any) -> str:
+    """
+    Stable hash of a JSON-like payload (sorted keys, compact UTF-8 JSON, rounded floats).
+    """
+    blob = orjson.dumps(round_floats(obj), option=orjson.OPT_SORT_KEYS)
+    # Cache key only, not a security hash; SHA-256 is hardware-accelerated and beats blake2b at these sizes
+    return hashlib.sha256(blob, usedforsecurity=False).hexdigest()
+
+
+class TTLCache:
+    """
+    Small thread-safe in-memory LRU cache with a per-entry time-to-live.
+
+    Entries live only in this process (nothing is written to disk),
+    and are dropped after ttl seconds or when maxsize is exceeded.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
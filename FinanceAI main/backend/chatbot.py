@@ -1,8 +1,26 @@
 # backend/chatbot.py
-import json
-from groq import Groq
+import asyncio
+import os
+from contextlib import aclosing
+from typing import AsyncIterator, Awaitable, Callable, Dict, Hashable, Optional
 
-client = Groq()
+import httpx
+import orjson
+from groq import AsyncGroq, DefaultAsyncHttpxClient
+
+from .cache import TTLCache, payload_key
+from .ratelimit import RateLimiter
+
+# Async client (pooled connections) so endpoints never block the event loop during API calls.
+# The pool is sized for many concurrent requests; keep-alive connections skip the TLS handshake.
+# 429 and 5xx responses are retried by the client with exponential backoff (honouring retry-after).
+client = AsyncGroq(
+    timeout=float(os.getenv("LLM_TIMEOUT_SECONDS", "30")),
+    max_retries=int(os.getenv("LLM_MAX_RETRIES", "3")),
+    http_client=DefaultAsyncHttpxClient(
+        limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+    ),
+)
 
 SYSTEM_PROMPT = (
     "You are a financial education assistant for young adults.\n"
@@ -61,19 +79,104 @@ SYSTEM_PROMPT = (
     "- Do NOT use inline code/backticks (`) or code blocks.\n"
 )
 
+# Built once and always sent first, byte-identical, so the provider can reuse its
+# prompt-prefix cache across requests. Never interpolate per-user data into it.
+_SYSTEM_MSG = {"role": "system", "content": SYSTEM_PROMPT}
+
 GROQ_MODEL_NAME = "llama-3.1-8b-instant"
 
+# Client-side pacing to the account's Groq limits (0 = off). Tokens are estimated, see _completion.
+_rate_limiter = RateLimiter(
+    rpm=float(os.getenv("LLM_RPM", "0")),
+    tpm=float(os.getenv("LLM_TPM", "0")),
+)
+_EST_OUTPUT_TOKENS = 512
 
-def get_llm_explanation(llm_input: dict) -> str:
+# Exact-match caches for /generate explanations and /chat replies
+# (in-memory only, nothing is persisted). LLM_CACHE_TTL_SECONDS=0 disables them.
+_LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL_SECONDS", "3600"))
+_explanation_cache = TTLCache(maxsize=1024, ttl=_LLM_CACHE_TTL)
+_chat_cache = TTLCache(maxsize=1024, ttl=_LLM_CACHE_TTL)
+
+# LLM calls currently in flight, by cache key. Identical requests arriving before the
+# first one finishes (double submits, a batch with repeated plans) share its result.
+_inflight: Dict[Hashable, "asyncio.Future[str]"] = {}
+
+
+async def _single_flight(key: Hashable, call: Callable[[], Awaitable[str]]) -> str:
     """
-    Used for the /generate endpoint (initial explanation).
-    IMPORTANT: This function does NOT take a 'message' param.
+    Await call(), or the already-running call for the same key.
+    Shielded, so a disconnecting client doesn't cancel the call the others are waiting on.
+    """
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(call())
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    return await asyncio.shield(task)
+
+
+async def warm_up() -> None:
     """
-    json_str = json.dumps(llm_input, ensure_ascii=False, indent=2)
+    Open the TLS connections to Groq (DNS, handshake, auth) before the first user request.
+    models.list() costs no tokens. Failures are ignored; requests report them normally.
+    """
+    try:
+        await client.models.list()
+    except Exception:
+        pass
+
+
+async def aclose() -> None:
+    """
+    Close the pooled Groq connections (called on app shutdown).
+    """
+    await client.close()
+
+
+async def _completion(messages: list, stream: bool = False):
+    """
+    One chat completion (or completion stream) after waiting for rate-limit room.
+    Token estimate: ~4 characters per prompt token plus a typical answer length.
+    """
+    est_tokens = sum(len(m["content"]) for m in messages) // 4 + _EST_OUTPUT_TOKENS
+    await _rate_limiter.acquire(est_tokens)
+    return await client.chat.completions.create(
+        model=GROQ_MODEL_NAME,
+        messages=messages,
+        temperature=0.4,
+        stream=stream,
+    )
+
+
+async def _stream_deltas(messages: list, parts: list) -> AsyncIterator[str]:
+    """
+    Text chunks of one streamed completion, each also appended to parts
+    (so callers can cache the full answer, or tell a partial one apart on error).
+    Iterate it under aclosing() so an abandoned caller closes the stream right away.
+    """
+    stream = await _completion(messages, stream=True)
+    # Closing on exit returns the pooled connection even when reading stops early
+    # (API error mid-stream, or the client disconnecting)
+    async with stream:
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                yield delta
+
+
+def _explanation_messages(llm_input: dict) -> list:
+    """
+    System + user messages for the /generate explanation.
+    """
+    # Compact JSON: indentation roughly doubles the prompt tokens without helping the model
+    json_str = orjson.dumps(llm_input).decode()
 
     user_prompt = (
-        "Here is a user's financial situation and computed plan in JSON.\n"
-        "Use ONLY the numbers and categories present in the JSON.\n\n"
+        "Here is a user's financial situation and computed plan in JSON.\n\n"
         f"{json_str}\n\n"
         "Write a response with:\n"
         "1) A short summary (2–4 sentences).\n"
@@ -90,35 +193,79 @@ def get_llm_explanation(llm_input: dict) -> str:
         "   - Summarize the provided fields and notes.\n"
         "   - Do NOT compute new months or amounts.\n"
         "7) 3–5 concrete next steps for the next 1–3 months (bullets).\n"
-        "8) One short motivational sentence.\n\n"
-        "Do NOT invent or recompute numbers.\n"
-        "Write in second person (you/your).\n"
-        "Use plain text + bullet points only.\n"
+        "8) One short motivational sentence.\n"
+    )
+
+    return [_SYSTEM_MSG, {"role": "user", "content": user_prompt}]
+
+
+def _explanation_error(e: Exception) -> str:
+    return (
+        "I couldn't reach the Groq LLM API. "
+        f"Error: {e}. Please check your GROQ_API_KEY and internet connection."
     )
 
+
+async def get_llm_explanation(llm_input: dict, cache_key: Optional[str] = None) -> str:
+    """
+    Used for the /generate endpoint (initial explanation).
+    IMPORTANT: This function does NOT take a 'message' param.
+
+    Identical payloads are answered from an in-memory cache instead of calling
+    Groq again. cache_key (e.g. the plan_id fingerprint) skips hashing the whole
+    payload; without it the key is payload_key(llm_input), floats rounded to cents.
+    """
+    cache_key = cache_key or payload_key(llm_input)
+    cached = _explanation_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    async def call() -> str:
+        try:
+            response = await _completion(_explanation_messages(llm_input))
+            text = response.choices[0].message.content.strip()
+        except Exception as e:
+            # Errors are not cached, so the next request retries the API
+            return _explanation_error(e)
+
+        _explanation_cache.set(cache_key, text)
+        return text
+
+    return await _single_flight(("explanation", cache_key), call)
+
+
+async def stream_llm_explanation(llm_input: dict, cache_key: Optional[str] = None) -> AsyncIterator[str]:
+    """
+    Streaming variant of get_llm_explanation for /generate/stream.
+    Yields text chunks as Groq produces them; shares the same cache and keys
+    (a cached explanation is yielded as a single chunk).
+    """
+    cache_key = cache_key or payload_key(llm_input)
+    cached = _explanation_cache.get(cache_key)
+    if cached is not None:
+        yield cached
+        return
+
+    parts = []
     try:
-        response = client.chat.completions.create(
-            model=GROQ_MODEL_NAME,
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": user_prompt},
-            ],
-            temperature=0.4,
-        )
-        return response.choices[0].message.content.strip()
+        async with aclosing(_stream_deltas(_explanation_messages(llm_input), parts)) as deltas:
+            async for delta in deltas:
+                yield delta
     except Exception as e:
-        return (
-            "I couldn't reach the Groq LLM API. "
-            f"Error: {e}. Please check your GROQ_API_KEY and internet connection."
-        )
+        # A partial answer is not cached; report the error in-stream like the non-streaming path
+        yield ("\n\n" if parts else "") + _explanation_error(e)
+        return
 
+    _explanation_cache.set(cache_key, "".join(parts).strip())
 
-def chat_freeform(message: str, context: dict | None = None) -> str:
+
+def _chat_messages(message: str, context: dict | None = None) -> list:
+    """
+    System + user messages for a /chat turn.
+    """
     context_str = ""
     if context:
-        context_str = "\n\nContext JSON (do not recalculate numbers):\n" + json.dumps(
-            context, ensure_ascii=False, indent=2
-        )
+        context_str = "\n\nContext JSON (do not recalculate numbers):\n" + orjson.dumps(context).decode()
 
     user_prompt = (
         f"User question:\n{message}\n"
@@ -129,15 +276,51 @@ def chat_freeform(message: str, context: dict | None = None) -> str:
         "If talking about investing: education only, no tickers, no promises.\n"
     )
 
+    return [_SYSTEM_MSG, {"role": "user", "content": user_prompt}]
+
+
+def _chat_key(message: str, context: dict | None) -> str:
+    # The reply depends only on the question and the plan context (history isn't sent)
+    return payload_key({"message": message, "context": context})
+
+
+async def chat_freeform(message: str, context: dict | None = None) -> str:
+    cache_key = _chat_key(message, context)
+    cached = _chat_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    async def call() -> str:
+        try:
+            response = await _completion(_chat_messages(message, context))
+            text = response.choices[0].message.content.strip()
+        except Exception as e:
+            return f"I couldn't reach the Groq LLM API. Error: {e}"
+
+        _chat_cache.set(cache_key, text)
+        return text
+
+    return await _single_flight(("chat", cache_key), call)
+
+
+async def stream_chat_freeform(message: str, context: dict | None = None) -> AsyncIterator[str]:
+    """
+    Streaming variant of chat_freeform for /chat/stream.
+    Yields text chunks as Groq produces them; shares chat_freeform's cache.
+    """
+    cache_key = _chat_key(message, context)
+    cached = _chat_cache.get(cache_key)
+    if cached is not None:
+        yield cached
+        return
+
+    parts = []
     try:
-        response = client.chat.completions.create(
-            model=GROQ_MODEL_NAME,
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": user_prompt},
-            ],
-            temperature=0.4,
-        )
-        return response.choices[0].message.content.strip()
+        async with aclosing(_stream_deltas(_chat_messages(message, context), parts)) as deltas:
+            async for delta in deltas:
+                yield delta
     except Exception as e:
-        return f"I couldn't reach the Groq LLM API. Error: {e}"
+        yield ("\n\n" if parts else "") + f"I couldn't reach the Groq LLM API. Error: {e}"
+        return
+
+    _chat_cache.set(cache_key, "".join(parts).strip())
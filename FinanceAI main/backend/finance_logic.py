@@ -1,18 +1,65 @@
 # backend/finance_logic.py
 
 from __future__ import annotations
-from typing import Dict, Any, Optional
+from bisect import bisect_right
+from functools import lru_cache
+from operator import itemgetter
+from typing import TYPE_CHECKING, Dict, Any, NamedTuple, Optional
+
+if TYPE_CHECKING:  # numpy is imported lazily by the batch helpers below
+    import numpy as np
+
+__all__ = [
+    "SCORE_COLUMNS",
+    "FinancialScore",
+    "safe_div",
+    "clamp",
+    "percent",
+    "round2",
+    "compute_score",
+    "compute_score_values",
+    "compute_financial_score",
+    "compute_financial_score_batch",
+    "compute_financial_score_arrays",
+    "score_many",
+    "generate_budget",
+    "generate_budget_values",
+    "build_savings_goal_plan",
+]
+
+try:
+    from numba import njit, prange, float64
+    from numba.types import UniTuple
+except ImportError:  # numba is optional; kernels then run as plain Python
+    njit = None
+    prange = range
+
+
+def _jit(signature: Any = None, **options: Any):
+    """
+    Compile a numeric kernel with numba when it is installed.
+    Without numba the function is returned unchanged.
+    """
+    if njit is None:
+        return lambda fn: fn
+    return njit(signature, **options) if signature is not None else njit(**options)
+
+
+if njit is not None:
+    # (income, fixed, variable, debt_payment, debt_balance, savings_monthly, savings_total, target)
+    _SCORE_KERNEL_SIG = UniTuple(float64, 5)(
+        float64, float64, float64, float64, float64, float64, float64, float64
+    )
+else:
+    _SCORE_KERNEL_SIG = None
 
 
 def safe_div(a: float, b: float) -> float:
     """
     Safe division helper.
-    Returns 0.0 if denominator is zero or invalid.
+    Returns 0.0 if denominator is zero.
     """
-    try:
-        return (a / b) if b else 0.0
-    except Exception:
-        return 0.0
+    return (a / b) if b else 0.0
 
 
 def clamp(v: float, lo: float, hi: float) -> float:
@@ -40,7 +87,244 @@ def round2(x: float) -> float:
         return 0.0
 
 
-def compute_financial_score(payload: Dict[str, Any]) -> Dict[str, Any]:
+# Column order for compute_financial_score_batch (one row per profile)
+SCORE_COLUMNS = (
+    "monthly_income",
+    "fixed_expenses",
+    "variable_expenses",
+    "debt_monthly_payment",
+    "debt_total_balance",
+    "savings_monthly",
+    "savings_total",
+    "emergency_months_target",
+)
+_SCORE_DEFAULTS = (0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 3.0)
+_get_score_inputs = itemgetter(*SCORE_COLUMNS)
+_EMPTY_SCORE_PAYLOAD = dict(zip(SCORE_COLUMNS, _SCORE_DEFAULTS))
+
+# Scoring thresholds (module constants so numba folds them into the kernel)
+_SAVINGS_RATE_TARGET = 0.20      # 20% savings rate -> full score
+_DEBT_BREAKS = (0.10, 0.40)      # debt-to-income: 100 at or below, 0 at or above
+_HOUSING_BREAKS = (0.30, 0.50)   # fixed/income: 100 at or below, 0 at or above
+
+# State label by overall score: < 40 critical, < 60 vulnerable, < 80 stable, else strong.
+# Lookups use bisect_right / side="right" so a score exactly on a threshold moves up a tier.
+_STATE_THRESHOLDS = (40.0, 60.0, 80.0)
+_STATES = ("critical", "vulnerable", "stable", "strong")
+
+# Budget mode -> target savings rate (unknown modes fall back to normal)
+_MODE_RATES = {"super": 0.30, "normal": 0.20, "relaxed": 0.10}
+_DEFAULT_MODE = "normal"
+
+
+@_jit(inline="always", cache=True)
+def _clamp01(x: float) -> float:
+    """
+    Clamp into [0, 1] without branches (compiles to min/max instructions).
+    """
+    return max(0.0, min(1.0, x))
+
+
+@_jit(inline="always", cache=True)
+def _linramp_down(x: float, lo: float, hi: float) -> float:
+    """
+    Score that is 100 at x <= lo, 0 at x >= hi and linear in between.
+    """
+    return 100.0 * _clamp01((hi - x) / (hi - lo))
+
+
+@_jit(_SCORE_KERNEL_SIG, cache=True, fastmath=True, boundscheck=False)
+def _score_kernel(
+    income: float,
+    fixed: float,
+    variable: float,
+    debt_payment: float,
+    debt_balance: float,
+    savings_monthly: float,
+    savings_total: float,
+    emergency_target: float,
+):
+    """
+    Numeric core of compute_financial_score.
+    Returns (overall, savings_rate, debt_to_income, housing_pct, emergency_months).
+    """
+    # -----------------------------
+    # Step 2: Compute basic ratios
+    # -----------------------------
+    savings_rate = (savings_monthly / income) if income else 0.0
+    debt_to_income = (debt_payment / income) if income else 0.0
+    housing_pct = (fixed / income) if income else 0.0
+
+    # Emergency fund months = savings_total / monthly expenses
+    monthly_expenses = max(1.0, fixed + variable)
+    emergency_months = savings_total / monthly_expenses
+
+    # -----------------------------
+    # Step 3: Score components
+    # -----------------------------
+    # Savings rate score: 20% savings -> 100, linear up to that
+    savings_rate_score = 100.0 * _clamp01(savings_rate / _SAVINGS_RATE_TARGET)
+
+    # Debt score: <=10% debt-to-income is best, >=40% is worst, linear in between
+    debt_score = _linramp_down(debt_to_income, _DEBT_BREAKS[0], _DEBT_BREAKS[1])
+
+    # Housing score: <=30% fixed/income best, >=50% worst, linear in between
+    housing_score = _linramp_down(housing_pct, _HOUSING_BREAKS[0], _HOUSING_BREAKS[1])
+
+    # Emergency score: >= target is 100, else linear
+    # (target floored at 0.1 months so a tiny target can't blow up the ratio)
+    emergency_score = 100.0 * _clamp01(emergency_months / max(0.1, emergency_target))
+
+    # -----------------------------
+    # Step 4: Weighted total score
+    # -----------------------------
+    overall = (
+        emergency_score * 0.30 +
+        debt_score * 0.28 +
+        savings_rate_score * 0.22 +
+        housing_score * 0.20
+    )
+    overall = max(0.0, min(100.0, overall))
+
+    return overall, savings_rate, debt_to_income, housing_pct, emergency_months
+
+
+@_jit(cache=True, parallel=True)
+def _score_rows(data, out):
+    """
+    Fill out[i] with _score_kernel(*data[i]) for every row, in parallel across cores
+    when numba is available. An emergency target of 0 falls back to 3 months.
+    """
+    for i in prange(data.shape[0]):
+        target = data[i, 7] if data[i, 7] != 0.0 else 3.0
+        overall, savings_rate, debt_to_income, housing_pct, emergency_months = _score_kernel(
+            data[i, 0], data[i, 1], data[i, 2], data[i, 3], data[i, 4], data[i, 5], data[i, 6], target
+        )
+        out[i, 0] = overall
+        out[i, 1] = savings_rate
+        out[i, 2] = debt_to_income
+        out[i, 3] = housing_pct
+        out[i, 4] = emergency_months
+
+
+def score_many(data: np.ndarray) -> np.ndarray:
+    """
+    Run the scoring kernel over every row of an (N, 8) float64 array (SCORE_COLUMNS order).
+    Intended for tight scenario loops (stress tests, Monte-Carlo sweeps).
+
+    Returns an (N, 5) array: overall, savings_rate, debt_to_income, housing_pct, emergency_months.
+    """
+    import numpy as np
+
+    data = np.ascontiguousarray(data, dtype=np.float64).reshape(-1, len(SCORE_COLUMNS))
+    out = np.empty((data.shape[0], 5))
+    _score_rows(data, out)
+    return out
+
+
+class FinancialScore(NamedTuple):
+    """
+    Fixed-schema score result. Cheaper to build and read than the nested
+    dict; use as_dict() where the API / LLM shape is needed.
+    """
+    score: float
+    state: str
+    savings_rate_pct: float
+    debt_to_income_pct: float
+    housing_pct: float
+    emergency_fund_months: float
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Nested {"score", "state", "components"} dict returned by compute_financial_score.
+        """
+        return {
+            "score": self.score,
+            "state": self.state,
+            "components": {
+                "savings_rate_pct": self.savings_rate_pct,
+                "debt_to_income_pct": self.debt_to_income_pct,
+                "housing_pct": self.housing_pct,
+                "emergency_fund_months": self.emergency_fund_months,
+            }
+        }
+
+
+# ~1024 cached 6-field tuples is on the order of 100 KB
+@lru_cache(maxsize=1024)
+def _score_cached(
+    income: float,
+    fixed: float,
+    variable: float,
+    debt_payment: float,
+    debt_balance: float,
+    savings_monthly: float,
+    savings_total: float,
+    emergency_target: float,
+) -> FinancialScore:
+    """
+    Memoized scoring on already-rounded inputs, keyed on the 8-float tuple.
+    Returns an immutable FinancialScore tuple, so cached hits are shared safely.
+    """
+    overall, savings_rate, debt_to_income, housing_pct, emergency_months = _score_kernel(
+        income, fixed, variable, debt_payment, debt_balance, savings_monthly, savings_total, emergency_target
+    )
+
+    # -----------------------------
+    # Step 5: State label
+    # -----------------------------
+    state = _STATES[bisect_right(_STATE_THRESHOLDS, overall)]
+
+    return FinancialScore(
+        score=round2(overall),
+        state=state,
+        savings_rate_pct=round2(percent(savings_rate)),
+        debt_to_income_pct=round2(percent(debt_to_income)),
+        housing_pct=round2(housing_pct),
+        emergency_fund_months=round2(emergency_months),
+    )
+
+
+# Precomputed result for the empty profile (bypasses the LRU so it never gets evicted)
+_EMPTY_PROFILE_SCORE = _score_cached.__wrapped__(*_SCORE_DEFAULTS)
+
+
+def compute_score_values(
+    income: float,
+    fixed: float,
+    variable: float,
+    debt_payment: float,
+    debt_balance: float,
+    savings_monthly: float,
+    savings_total: float,
+    emergency_target: float = 3.0,
+) -> FinancialScore:
+    """
+    Score already-typed numeric inputs (e.g. fields of a validated Pydantic model)
+    without any dict lookups or float() coercion.
+
+    Inputs are rounded to cents, so repeated submissions of the same
+    numbers are served from the _score_cached LRU cache.
+    An emergency target of 0 falls back to 3 months.
+    """
+    inputs = (
+        round(income, 2),
+        round(fixed, 2),
+        round(variable, 2),
+        round(debt_payment, 2),
+        round(debt_balance, 2),
+        round(savings_monthly, 2),
+        round(savings_total, 2),
+        round(emergency_target or 3.0, 2),
+    )
+
+    # Empty profile (no income, no savings): every ratio is 0, so the result is fixed
+    if inputs[0] == 0.0 and inputs[6] == 0.0:
+        return _EMPTY_PROFILE_SCORE
+    return _score_cached(*inputs)
+
+
+def compute_score(payload: Dict[str, Any]) -> FinancialScore:
     """
     Compute a simple financial well-being score from monthly inputs.
 
@@ -56,55 +340,97 @@ def compute_financial_score(payload: Dict[str, Any]) -> Dict[str, Any]:
     # -----------------------------
     # Step 1: Extract inputs
     # -----------------------------
-    income = float(payload.get("monthly_income", 0) or 0)
-    fixed = float(payload.get("fixed_expenses", 0) or 0)
-    variable = float(payload.get("variable_expenses", 0) or 0)
-    debt_payment = float(payload.get("debt_monthly_payment", 0) or 0)
-    savings_monthly = float(payload.get("savings_monthly", 0) or 0)
-    savings_total = float(payload.get("savings_total", 0) or 0)
-    emergency_target = float(payload.get("emergency_months_target", 3) or 3)
+    values = _get_score_inputs({**_EMPTY_SCORE_PAYLOAD, **payload})
+    return compute_score_values(*[float(v or d) for v, d in zip(values, _SCORE_DEFAULTS)])
+
+
+def compute_financial_score(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Dict version of compute_score: {"score", "state", "components": {...}}.
+    """
+    return compute_score(payload).as_dict()
+
+
+def compute_financial_score_batch(payloads: np.ndarray) -> Dict[str, Any]:
+    """
+    Vectorized compute_financial_score for many profiles at once
+    (bulk uploads, scenario sweeps, projections).
+
+    Input:
+      - payloads: (N, 8) float64 array, columns in SCORE_COLUMNS order.
+        An emergency target of 0 falls back to 3 months, like the scalar path.
+
+    Output: same as compute_financial_score_arrays.
+    With numba installed, rows are scored by the compiled parallel kernel (score_many).
+    """
+    import numpy as np
+
+    data = np.asarray(payloads, dtype=np.float64).reshape(-1, len(SCORE_COLUMNS))
+    if njit is None:
+        return compute_financial_score_arrays(*data.T)
+    return _batch_result(*score_many(data).T)
+
+
+def compute_financial_score_arrays(
+    income,
+    fixed,
+    variable,
+    debt_payment,
+    debt_balance,
+    savings_monthly,
+    savings_total,
+    emergency_target=3.0,
+) -> Dict[str, Any]:
+    """
+    Column-wise vectorized scoring. Each argument is a scalar or array;
+    they are broadcast together, so e.g. a 1-D income sweep can be scored
+    against fixed scalar expenses without building an (N, 8) matrix.
+    debt_balance doesn't affect the score (nor in the scalar kernel); it is kept
+    for signature parity and still broadcast, so a mis-shaped array raises.
+
+    Output (unrounded, one entry per broadcast element):
+      - score: overall score in [0, 100]
+      - state: critical / vulnerable / stable / strong
+      - components: savings_rate, debt_to_income, housing_pct, emergency_fund_months (ratios, not percents)
+    """
+    import numpy as np
+
+    income, fixed, variable, debt_payment, _, savings_monthly, savings_total, emergency_target = np.broadcast_arrays(
+        *(np.asarray(a, dtype=np.float64) for a in (
+            income, fixed, variable, debt_payment, debt_balance, savings_monthly, savings_total, emergency_target
+        ))
+    )
+    emergency_target = np.where(emergency_target == 0, 3.0, emergency_target)
 
     # -----------------------------
     # Step 2: Compute basic ratios
     # -----------------------------
-    savings_rate = safe_div(savings_monthly, income)
-    debt_to_income = safe_div(debt_payment, income)
-    housing_pct = safe_div(fixed, income)
+    # Vectorized safe_div: ratios are 0.0 where income is 0
+    has_income = income != 0
+    savings_rate = np.divide(savings_monthly, income, out=np.zeros_like(income), where=has_income)
+    debt_to_income = np.divide(debt_payment, income, out=np.zeros_like(income), where=has_income)
+    housing_pct = np.divide(fixed, income, out=np.zeros_like(income), where=has_income)
 
     # Emergency fund months = savings_total / monthly expenses
-    monthly_expenses = max(1.0, fixed + variable)
-    emergency_months = safe_div(savings_total, monthly_expenses)
+    monthly_expenses = np.maximum(1.0, fixed + variable)
+    emergency_months = savings_total / monthly_expenses
 
     # -----------------------------
     # Step 3: Score components
     # -----------------------------
     # Savings rate score: 20% savings -> 100, linear up to that
-    savings_rate_score = clamp((savings_rate / 0.20) * 100.0, 0.0, 100.0)
+    savings_rate_score = np.clip(savings_rate / _SAVINGS_RATE_TARGET, 0.0, 1.0) * 100.0
 
-    # Debt score: <=10% debt-to-income is best, >=40% is worst
-    if debt_to_income <= 0.10:
-        debt_score = 100.0
-    elif debt_to_income >= 0.40:
-        debt_score = 0.0
-    else:
-        # linear between 0.10 and 0.40
-        debt_score = (1.0 - (debt_to_income - 0.10) / 0.30) * 100.0
-    debt_score = clamp(debt_score, 0.0, 100.0)
-
-    # Housing score: <=30% fixed/income best, >=50% worst
-    if housing_pct <= 0.30:
-        housing_score = 100.0
-    elif housing_pct >= 0.50:
-        housing_score = 0.0
-    else:
-        housing_score = (1.0 - (housing_pct - 0.30) / 0.20) * 100.0
-    housing_score = clamp(housing_score, 0.0, 100.0)
+    # Debt score: <=10% debt-to-income is best, >=40% is worst, linear in between
+    debt_lo, debt_hi = _DEBT_BREAKS
+    debt_score = np.clip((debt_hi - debt_to_income) / (debt_hi - debt_lo), 0.0, 1.0) * 100.0
+
+    # Housing score: <=30% fixed/income best, >=50% worst, linear in between
+    housing_lo, housing_hi = _HOUSING_BREAKS
+    housing_score = np.clip((housing_hi - housing_pct) / (housing_hi - housing_lo), 0.0, 1.0) * 100.0
 
     # Emergency score: >= target is 100, else linear
-    if emergency_months >= emergency_target:
-        emergency_score = 100.0
-    else:
-        emergency_score = clamp((emergency_months / emergency_target) * 100.0, 0.0, 100.0)
+    emergency_score = np.clip(emergency_months / np.maximum(0.1, emergency_target), 0.0, 1.0) * 100.0
 
     # -----------------------------
     # Step 4: Weighted total score
@@ -115,31 +441,30 @@ def compute_financial_score(payload: Dict[str, Any]) -> Dict[str, Any]:
         savings_rate_score * 0.22 +
         housing_score * 0.20
     )
-    overall = clamp(overall, 0.0, 100.0)
+    overall = np.clip(overall, 0.0, 100.0)
+
+    return _batch_result(overall, savings_rate, debt_to_income, housing_pct, emergency_months)
+
+
+def _batch_result(overall, savings_rate, debt_to_income, housing_pct, emergency_months) -> Dict[str, Any]:
+    """
+    Attach state labels and build the batch output dict from per-row arrays.
+    """
+    import numpy as np
 
     # -----------------------------
     # Step 5: State label
     # -----------------------------
-    if overall < 40:
-        state = "critical"
-    elif overall < 60:
-        state = "vulnerable"
-    elif overall < 80:
-        state = "stable"
-    else:
-        state = "strong"
+    state = np.asarray(_STATES)[np.searchsorted(_STATE_THRESHOLDS, overall, side="right")]
 
-    # -----------------------------
-    # Step 6: Return full breakdown
-    # -----------------------------
     return {
-        "score": round2(overall),
+        "score": overall,
         "state": state,
         "components": {
-            "savings_rate_pct": round2(percent(savings_rate)),
-            "debt_to_income_pct": round2(percent(debt_to_income)),
-            "housing_pct": round2(housing_pct),
-            "emergency_fund_months": round2(emergency_months),
+            "savings_rate": savings_rate,
+            "debt_to_income": debt_to_income,
+            "housing_pct": housing_pct,
+            "emergency_fund_months": emergency_months,
         }
     }
 
@@ -151,24 +476,40 @@ def generate_budget(payload: Dict[str, Any], mode: str = "normal") -> Dict[str,
       - normal  : balanced
       - relaxed : more spending, lower savings
     """
-    income = float(payload.get("monthly_income", 0) or 0)
-    fixed = float(payload.get("fixed_expenses", 0) or 0)
-    current_variable = float(payload.get("variable_expenses", 0) or 0)
-    debt = float(payload.get("debt_monthly_payment", 0) or 0)
-    current_savings = float(payload.get("savings_monthly", 0) or 0)
+    return generate_budget_values(
+        float(payload.get("monthly_income", 0) or 0),
+        float(payload.get("fixed_expenses", 0) or 0),
+        float(payload.get("variable_expenses", 0) or 0),
+        float(payload.get("debt_monthly_payment", 0) or 0),
+        float(payload.get("savings_monthly", 0) or 0),
+        mode,
+    )
 
-    # Money left after fixed + debt
-    flexible_pool = max(0.0, income - fixed - debt)
 
+def generate_budget_values(
+    income: float,
+    fixed: float,
+    current_variable: float,
+    debt: float,
+    current_savings: float,
+    mode: str = "normal",
+) -> Dict[str, Any]:
+    """
+    generate_budget on already-typed floats (e.g. fields of a validated Pydantic model),
+    without the dict lookups and float() coercion.
+    """
     # Determine target savings rate based on mode
-    mode = (mode or "normal").lower()
-    if mode == "super":
-        target_savings_rate = 0.30
-    elif mode == "relaxed":
-        target_savings_rate = 0.10
-    else:
-        mode = "normal"
-        target_savings_rate = 0.20
+    mode = (mode or _DEFAULT_MODE).lower()
+    if mode not in _MODE_RATES:
+        mode = _DEFAULT_MODE
+    target_savings_rate = _MODE_RATES[mode]
+
+    # Nothing entered yet: every figure is 0, serve the prebuilt plan for this mode
+    if not (income or fixed or current_variable or debt or current_savings) and mode in _ZERO_BUDGETS:
+        return _ZERO_BUDGETS[mode]
+
+    # Money left after fixed + debt
+    flexible_pool = max(0.0, income - fixed - debt)
 
     # Ideal savings by target rate
     ideal_savings = income * target_savings_rate
@@ -179,8 +520,11 @@ def generate_budget(payload: Dict[str, Any], mode: str = "normal") -> Dict[str,
     else:
         recommended_savings = ideal_savings
 
-    # Clamp recommended savings to [0, flexible_pool]
-    recommended_savings = clamp(recommended_savings, 0.0, flexible_pool)
+    # Clamp recommended savings to [0, flexible_pool] (inlined: this runs on every /generate)
+    if recommended_savings > flexible_pool:
+        recommended_savings = flexible_pool
+    if recommended_savings < 0.0:
+        recommended_savings = 0.0
     recommended_variable = max(0.0, flexible_pool - recommended_savings)
 
     # Leftover if anything remains (should usually be 0)
@@ -210,12 +554,17 @@ def generate_budget(payload: Dict[str, Any], mode: str = "normal") -> Dict[str,
         },
         "meta": {
             "flexible_pool": round2(flexible_pool),
-            "target_savings_rate_pct": round2(percent(target_savings_rate)),
+            "target_savings_rate_pct": round2(target_savings_rate * 100.0),
             "monthly_goal_capacity": round2(monthly_goal_capacity),  # ✅ added
         }
     }
 
 
+# All-zero budget per mode, built once by the function itself. Shared: treat as read-only.
+_ZERO_BUDGETS: Dict[str, Dict[str, Any]] = {}
+_ZERO_BUDGETS.update({m: generate_budget_values(0.0, 0.0, 0.0, 0.0, 0.0, m) for m in _MODE_RATES})
+
+
 
 def build_savings_goal_plan(
     *,
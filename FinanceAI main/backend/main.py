@@ -1,19 +1,76 @@
 # backend/main.py
 from __future__ import annotations
 
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from functools import lru_cache
+
+from fastapi import Body, FastAPI, Request
+from fastapi.responses import Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-from typing import List, Literal, Optional, Dict, Any
+from fastapi.routing import APIRoute
+from pydantic import BaseModel, Field, TypeAdapter
+from typing import List, Literal, Optional, Dict, Any, Tuple
+from operator import itemgetter
+import asyncio
 import hashlib
-import json
+import heapq
 import math
+import os
 import re
 
-from .finance_logic import compute_financial_score, generate_budget
-from .chatbot import get_llm_explanation, chat_freeform
+import orjson
+
+from .cache import TTLCache, round_floats
+from .finance_logic import compute_score_values, generate_budget_values
+from .chatbot import (
+    aclose as close_llm_client,
+    chat_freeform,
+    get_llm_explanation,
+    stream_chat_freeform,
+    stream_llm_explanation,
+    warm_up,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm the Groq connections in the background so startup isn't delayed
+    warmup_task = asyncio.create_task(warm_up())
+    yield
+    warmup_task.cancel()
+    await close_llm_client()
+
+
+class ORJSONRequest(Request):
+    """
+    Request whose JSON body is parsed with orjson instead of the stdlib json module.
+    Malformed bodies still raise json.JSONDecodeError (orjson's error subclasses it),
+    so FastAPI reports them as 422 validation errors as before.
+    """
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            self._json = orjson.loads(await self.body())
+        return self._json
+
 
-app = FastAPI()
+class ORJSONRoute(APIRoute):
+    """
+    Route class that hands endpoints an ORJSONRequest. Body validation and the
+    OpenAPI schema still come from the endpoint's Pydantic models.
+    """
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def orjson_route_handler(request: Request) -> Response:
+            return await handler(ORJSONRequest(request.scope, request.receive))
+
+        return orjson_route_handler
+
+
+app = FastAPI(lifespan=lifespan)
+app.router.route_class = ORJSONRoute
 
 app.add_middleware(
     CORSMiddleware,
@@ -26,53 +83,48 @@ app.add_middleware(
 # ------------------------------------------------------------
 # Helpers: region inference
 # ------------------------------------------------------------
+_US_ALIAS = frozenset({"united states", "usa", "us", "america"})
+_UK_ALIAS = frozenset({"united kingdom", "uk", "britain", "great britain", "england", "scotland", "wales", "northern ireland"})
+_IN_ALIAS = frozenset({"india", "bharat"})
+_JP_ALIAS = frozenset({"japan"})
+_EU_COUNTRIES = frozenset({
+    "germany","france","spain","italy","netherlands","belgium","austria","ireland",
+    "finland","sweden","denmark","portugal","poland","czech republic","greece","romania",
+    "hungary","slovakia","slovenia","croatia","bulgaria","latvia","lithuania","estonia",
+    "luxembourg","malta","cyprus"
+})
+
+# Currency code (first 3 chars of e.g. "USD ($)") -> region
+_CURRENCY_REGION = {
+    "USD": "US",
+    "CAD": "CA",
+    "AUD": "AU",
+    "EUR": "EU",
+    "GBP": "UK",
+    "JPY": "JP",
+    "INR": "IN",
+}
+
+
+# Pure function of two short strings; real traffic repeats a handful of (country, currency) pairs
+@lru_cache(maxsize=4096)
 def infer_region(country: Optional[str], currency: str) -> str:
     if country:
         c = country.strip().lower()
 
-        us_alias = {"united states", "usa", "us", "america"}
-        uk_alias = {"united kingdom", "uk", "britain", "great britain", "england", "scotland", "wales", "northern ireland"}
-        in_alias = {"india", "bharat"}
-        jp_alias = {"japan"}
-
-        if c in us_alias:
+        if c in _US_ALIAS:
             return "US"
-        if c in uk_alias:
+        if c in _UK_ALIAS:
             return "UK"
-        if c in in_alias:
+        if c in _IN_ALIAS:
             return "IN"
-        if c in jp_alias:
+        if c in _JP_ALIAS:
             return "JP"
-
-        eu_countries = {
-            "germany","france","spain","italy","netherlands","belgium","austria","ireland",
-            "finland","sweden","denmark","portugal","poland","czech republic","greece","romania",
-            "hungary","slovakia","slovenia","croatia","bulgaria","latvia","lithuania","estonia",
-            "luxembourg","malta","cyprus"
-        }
-        if c in eu_countries:
+        if c in _EU_COUNTRIES:
             return "EU"
 
     cur = (currency or "").upper().strip()
-    if cur.startswith("USD"):
-        return "US"
-    if cur.startswith("CAD"):
-        return "CA"
-    if cur.startswith("AUD"):
-        return "AU"
-    if cur.startswith("EUR"):
-        return "EU"
-    if cur.startswith("GBP"):
-        return "UK"
-    if cur.startswith("JPY"):
-        return "JP"
-    if cur.startswith("INR"):
-        return "IN"
-    return "GLOBAL"
-
-
-def safe_div(n: float, d: float) -> float:
-    return (n / d) if d else 0.0
+    return _CURRENCY_REGION.get(cur[:3], "GLOBAL")
 
 
 # ------------------------------------------------------------
@@ -113,43 +165,54 @@ def investment_readiness(
     return {"ready": len(blockers) == 0, "blockers": blockers, "reasons": reasons}
 
 
-def region_investing_education(region: str) -> Dict[str, Any]:
-    if region == "US":
-        return {
-            "wrappers": ["401(k)", "IRA / Roth IRA", "Taxable brokerage account"],
-            "etf_examples_no_tickers": [
-                "Total-market equity index fund",
-                "Global equity index fund",
-                "Broad bond index fund",
-            ],
-        }
-    if region == "EU":
-        return {
-            "wrappers": ["Country-specific tax-advantaged accounts", "Pension schemes", "Brokerage account"],
-            "etf_examples_no_tickers": [
-                "All-world equity index fund",
-                "Regional equity index fund",
-                "Government + investment-grade bond fund",
-            ],
-        }
-    if region == "IN":
-        return {
-            "wrappers": ["Mutual fund SIP", "Provident / retirement accounts", "Brokerage account"],
-            "etf_examples_no_tickers": [
-                "Broad Indian equity index fund",
-                "Diversified equity index fund",
-                "Short-duration or broad bond fund",
-            ],
-        }
-
-    return {
-        "wrappers": ["Tax-advantaged retirement account (if available)", "Brokerage account"],
+# Static per-region education content. Shared across requests: treat as read-only.
+_REGION_EDU: Dict[str, Dict[str, Any]] = {
+    "US": {
+        "wrappers": ["401(k)", "IRA / Roth IRA", "Taxable brokerage account"],
         "etf_examples_no_tickers": [
+            "Total-market equity index fund",
             "Global equity index fund",
-            "Balanced stock/bond fund",
             "Broad bond index fund",
         ],
-    }
+    },
+    "EU": {
+        "wrappers": ["Country-specific tax-advantaged accounts", "Pension schemes", "Brokerage account"],
+        "etf_examples_no_tickers": [
+            "All-world equity index fund",
+            "Regional equity index fund",
+            "Government + investment-grade bond fund",
+        ],
+    },
+    "IN": {
+        "wrappers": ["Mutual fund SIP", "Provident / retirement accounts", "Brokerage account"],
+        "etf_examples_no_tickers": [
+            "Broad Indian equity index fund",
+            "Diversified equity index fund",
+            "Short-duration or broad bond fund",
+        ],
+    },
+}
+_DEFAULT_REGION_EDU: Dict[str, Any] = {
+    "wrappers": ["Tax-advantaged retirement account (if available)", "Brokerage account"],
+    "etf_examples_no_tickers": [
+        "Global equity index fund",
+        "Balanced stock/bond fund",
+        "Broad bond index fund",
+    ],
+}
+
+
+def region_investing_education(region: str) -> Dict[str, Any]:
+    return _REGION_EDU.get(region, _DEFAULT_REGION_EDU)
+
+
+# The only four allocations the rules below can produce, built once.
+# Shared across requests: treat as read-only.
+_CASH_ONLY_STATES = frozenset({"critical", "vulnerable"})
+_ALLOC_CASH_ONLY: Dict[str, int] = {"stocks_pct": 0, "bonds_pct": 0, "cash_pct": 100}
+_ALLOC_CAUTIOUS: Dict[str, int] = {"stocks_pct": 40, "bonds_pct": 50, "cash_pct": 10}
+_ALLOC_BALANCED: Dict[str, int] = {"stocks_pct": 60, "bonds_pct": 35, "cash_pct": 5}
+_ALLOC_GROWTH: Dict[str, int] = {"stocks_pct": 80, "bonds_pct": 20, "cash_pct": 0}
 
 
 def portfolio_allocation_dynamic(
@@ -159,51 +222,64 @@ def portfolio_allocation_dynamic(
     savings_rate: float,
     debt_to_income: float,
 ) -> Dict[str, int]:
-    if score_state in ["critical", "vulnerable"]:
-        return {"stocks_pct": 0, "bonds_pct": 0, "cash_pct": 100}
+    if score_state in _CASH_ONLY_STATES:
+        return _ALLOC_CASH_ONLY
 
     if emergency_months < 3 or debt_to_income > 0.30:
-        return {"stocks_pct": 40, "bonds_pct": 50, "cash_pct": 10}
+        return _ALLOC_CAUTIOUS
 
     if savings_rate < 0.15:
-        return {"stocks_pct": 60, "bonds_pct": 35, "cash_pct": 5}
+        return _ALLOC_BALANCED
 
-    return {"stocks_pct": 80, "bonds_pct": 20, "cash_pct": 0}
+    return _ALLOC_GROWTH
+
+
+# All 21 possible 20-cell bars (one block per 5%), built once
+_BARS = tuple("█" * blocks + "░" * (20 - blocks) for blocks in range(21))
 
 
 def ascii_portfolio(allocation: Dict[str, int]) -> str:
+    return _ascii_portfolio(allocation["stocks_pct"], allocation["bonds_pct"], allocation["cash_pct"])
+
+
+# Keyed on the three percentages (a dict isn't hashable); only a few allocations ever occur
+@lru_cache(maxsize=64)
+def _ascii_portfolio(stocks_pct: int, bonds_pct: int, cash_pct: int) -> str:
     def bar(p: float) -> str:
-        blocks = int(p / 5)
-        return "█" * blocks + "░" * (20 - blocks)
+        return _BARS[int(p / 5)]
 
     return (
-        f"Stocks  {allocation['stocks_pct']:>3}% |{bar(allocation['stocks_pct'])}|\n"
-        f"Bonds   {allocation['bonds_pct']:>3}% |{bar(allocation['bonds_pct'])}|\n"
-        f"Cash    {allocation['cash_pct']:>3}% |{bar(allocation['cash_pct'])}|"
+        f"Stocks  {stocks_pct:>3}% |{bar(stocks_pct)}|\n"
+        f"Bonds   {bonds_pct:>3}% |{bar(bonds_pct)}|\n"
+        f"Cash    {cash_pct:>3}% |{bar(cash_pct)}|"
     )
 
 
-def strip_visual_from_financial_data(financial_data: Any) -> Any:
-    try:
-        if not isinstance(financial_data, dict):
-            return financial_data
-
-        fd = dict(financial_data)
-        inv = fd.get("investing")
-
-        if isinstance(inv, dict):
-            inv2 = dict(inv)
-            inv2.pop("allocation_visual", None)
-            fd["investing"] = inv2
-
-        return fd
-    except Exception:
-        return financial_data
+def format_breakdown_text(breakdown: List[Dict[str, Any]]) -> str:
+    """
+    Copy-ready bullets ("- name: amount") of the variable expense breakdown, for the chat model.
+    """
+    lines = []
+    for item in breakdown:
+        name = (item.get("name") or "").strip()
+        amt = item.get("amount")
+        if name and isinstance(amt, (int, float)):
+            lines.append(f"- {name}: {amt}")
+    return "\n".join(lines)
 
 
 # ------------------------------------------------------------
 # Savings goal: ideal timeline WITHOUT requiring goal months
 # ------------------------------------------------------------
+def _ceil_div(n: float, d: float) -> Optional[int]:
+    """
+    Months needed to save n at d per month, or None if nothing is saved.
+    Uses ceil(n / d) rather than -(-n // d): floor division works on the exact binary
+    quotient, so e.g. 26426.40 / 120.12 (exactly 220) would come out as 221.
+    """
+    return math.ceil(n / d) if d > 0 else None
+
+
 def compute_goal_timeline_ideal(
     *,
     goal_cost: Optional[float],
@@ -227,16 +303,16 @@ def compute_goal_timeline_ideal(
     planned_capacity = max(0.0, recommended_savings) + max(0.0, leftover)
     current_capacity = max(0.0, current_monthly_savings)
 
-    months_planned = math.ceil(goal_cost / planned_capacity) if planned_capacity > 0 else None
-    months_current = math.ceil(goal_cost / current_capacity) if current_capacity > 0 else None
+    months_planned = _ceil_div(goal_cost, planned_capacity)
+    months_current = _ceil_div(goal_cost, current_capacity)
 
     notes: List[str] = []
-    if planned_capacity > 0 and months_planned is not None:
+    if months_planned is not None:
         notes.append(f"Using your planned savings capacity, you could reach the goal in about {months_planned} months.")
     else:
         notes.append("Your planned savings capacity is 0, so a timeline can't be estimated until savings increases.")
 
-    if current_capacity > 0 and months_current is not None:
+    if months_current is not None:
         notes.append(f"Using your current monthly savings input, you could reach the goal in about {months_current} months.")
     else:
         notes.append("Your current monthly savings input is 0, so a timeline can't be estimated from current savings.")
@@ -253,20 +329,15 @@ def compute_goal_timeline_ideal(
     }
 
 
+_GOAL_TIMELINE_RE = re.compile(
+    r"\b(?:how long|how many months|how fast|time to|save up|reach (?:my )?goal|when can i)\b"
+)
+
+
 def looks_like_goal_timeline_question(msg: str) -> bool:
     if not msg:
         return False
-    m = msg.lower().strip()
-    patterns = [
-        r"\bhow long\b",
-        r"\bhow many months\b",
-        r"\bhow fast\b",
-        r"\btime to\b",
-        r"\bsave up\b",
-        r"\breach (my )?goal\b",
-        r"\bwhen can i\b",
-    ]
-    return any(re.search(p, m) for p in patterns)
+    return _GOAL_TIMELINE_RE.search(msg.lower()) is not None
 
 
 def format_goal_timeline_response(goal_obj: Dict[str, Any]) -> str:
@@ -282,14 +353,14 @@ def format_goal_timeline_response(goal_obj: Dict[str, Any]) -> str:
     m_planned = goal_obj.get("ideal_months_using_planned_savings")
     m_current = goal_obj.get("ideal_months_using_current_savings")
 
-    lines = []
-    lines.append("Savings goal timeline (estimated using your computed plan):")
-    lines.append(f"- Goal amount: {goal_cost} {cur}")
-    lines.append(f"- Planned savings capacity per month (recommended savings + leftover): {planned_cap:.2f} {cur}")
-    lines.append(f"- Ideal time using planned savings: about {m_planned} months" if m_planned is not None else "- Ideal time using planned savings: not available (capacity is 0)")
-    lines.append(f"- Your current monthly savings input: {current_save:.2f} {cur}")
-    lines.append(f"- Ideal time using current savings: about {m_current} months" if m_current is not None else "- Ideal time using current savings: not available (current savings is 0)")
-    return "\n".join(lines)
+    return "\n".join((
+        "Savings goal timeline (estimated using your computed plan):",
+        f"- Goal amount: {goal_cost} {cur}",
+        f"- Planned savings capacity per month (recommended savings + leftover): {planned_cap:.2f} {cur}",
+        f"- Ideal time using planned savings: about {m_planned} months" if m_planned is not None else "- Ideal time using planned savings: not available (capacity is 0)",
+        f"- Your current monthly savings input: {current_save:.2f} {cur}",
+        f"- Ideal time using current savings: about {m_current} months" if m_current is not None else "- Ideal time using current savings: not available (current savings is 0)",
+    ))
 
 
 # ------------------------------------------------------------
@@ -300,6 +371,10 @@ class VariableItem(BaseModel):
     amount: float = Field(ge=0)
 
 
+# Dumps the whole breakdown in one pydantic-core call instead of one model_dump() per item
+_BREAKDOWN_ADAPTER = TypeAdapter(List[VariableItem])
+
+
 class GenerateRequest(BaseModel):
     currency: str = "USD"
     country: Optional[str] = None
@@ -323,14 +398,63 @@ class GenerateRequest(BaseModel):
     savings_goal_name: Optional[str] = None 
 
 
+class ChatRequest(BaseModel):
+    message: Optional[str] = None
+    financial_data: Optional[Dict[str, Any]] = None
+    history: List[Dict[str, Any]] = []
+    plan_id: Optional[str] = None
+
+
 # ------------------------------------------------------------
-# Endpoint: generate
+# Plan building (shared by /generate and /generate/stream)
 # ------------------------------------------------------------
-@app.post("/generate")
-async def generate(req: GenerateRequest) -> Dict[str, Any]:
-    breakdown_total = sum(v.amount for v in req.variable_breakdown)
+# Variable expense categories included in the explanation prompt (largest first)
+LLM_BREAKDOWN_MAX_ITEMS = 5
+
+
+# Built plans by plan_id, so re-submitted forms skip the scoring/budget pipeline
+_plan_cache = TTLCache(maxsize=2048, ttl=3600.0)
+
+
+def build_plan(req: GenerateRequest) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Computes everything except the LLM explanation.
+    Returns (response body without "llm_explanation", llm_input for the explanation).
+    Results are cached and shared between requests: treat both dicts as read-only.
+    """
+    # Plain list of validated floats (no generator frame); fsum is exact for currency amounts
+    breakdown_total = math.fsum([v.amount for v in req.variable_breakdown]) if req.variable_breakdown else 0.0
     variable_total = breakdown_total if breakdown_total > 0 else req.variable_expenses
 
+    # Must cover every input the plan and explanation depend on: plan_id keys the plan and LLM caches
+    breakdown = _BREAKDOWN_ADAPTER.dump_python(req.variable_breakdown) if req.variable_breakdown else []
+    plan_fingerprint = {
+        "currency": req.currency,
+        "country": req.country,
+        "mode": req.budget_mode,
+        "income": req.monthly_income,
+        "fixed": req.fixed_expenses,
+        "variable": variable_total,
+        "debt": req.debt_monthly_payment,
+        "savings": req.savings_monthly,
+        "savings_total": req.savings_total,
+        "goal_cost": req.savings_goal_cost,
+        "breakdown": breakdown,
+        "debt_total": req.debt_total_balance,
+        "goal_months": req.savings_goal_months,
+        "goal_name": req.savings_goal_name,
+    }
+    # orjson's sorted-key bytes are canonical too, at a fraction of json.dumps(sort_keys=True)'s cost.
+    # plan_id is a dedup/cache key, not a security hash (usedforsecurity=False keeps FIPS builds happy);
+    # SHA-256 is hardware-accelerated on current CPUs and beats blake2b at this input size.
+    blob = orjson.dumps(plan_fingerprint, option=orjson.OPT_SORT_KEYS)
+    plan_id = hashlib.sha256(blob, usedforsecurity=False).hexdigest()[:16]
+
+    # Same inputs, same plan: everything below is a pure function of the fingerprint
+    cached = _plan_cache.get(plan_id)
+    if cached is not None:
+        return cached
+
     scoring_input = {
         "monthly_income": req.monthly_income,
         "fixed_expenses": req.fixed_expenses,
@@ -342,29 +466,48 @@ async def generate(req: GenerateRequest) -> Dict[str, Any]:
         "emergency_months_target": 3,
     }
 
-    score_obj = compute_financial_score(scoring_input)
-    budget_obj = generate_budget(scoring_input, mode=req.budget_mode)
+    # Pydantic already validated these as floats; score them without the dict round-trip
+    score = compute_score_values(
+        req.monthly_income,
+        req.fixed_expenses,
+        variable_total,
+        req.debt_monthly_payment,
+        req.debt_total_balance,
+        req.savings_monthly,
+        req.savings_total,
+        scoring_input["emergency_months_target"],
+    )
+    score_obj = score.as_dict()
+    budget_obj = generate_budget_values(
+        req.monthly_income,
+        req.fixed_expenses,
+        variable_total,
+        req.debt_monthly_payment,
+        req.savings_monthly,
+        mode=req.budget_mode,
+    )
 
     region = infer_region(req.country, req.currency)
 
     recommended_savings = float(budget_obj.get("totals", {}).get("recommended_savings", 0.0))
     leftover = float(budget_obj.get("totals", {}).get("leftover", 0.0))
-    emergency_months = float(score_obj.get("components", {}).get("emergency_fund_months", 0.0))
+    emergency_months = score.emergency_fund_months
 
     readiness = investment_readiness(
-        score_state=score_obj.get("state", "unknown"),
+        score_state=score.state,
         emergency_months=emergency_months,
         leftover=leftover,
         recommended_savings=recommended_savings,
     )
 
-    savings_rate = safe_div(req.savings_monthly, req.monthly_income)
-    debt_to_income = safe_div(req.debt_monthly_payment, req.monthly_income)
+    income = req.monthly_income
+    savings_rate = (req.savings_monthly / income) if income else 0.0
+    debt_to_income = (req.debt_monthly_payment / income) if income else 0.0
 
     education = region_investing_education(region)
 
     allocation = portfolio_allocation_dynamic(
-        score_state=score_obj.get("state", "unknown"),
+        score_state=score.state,
         emergency_months=emergency_months,
         savings_rate=savings_rate,
         debt_to_income=debt_to_income,
@@ -383,21 +526,14 @@ async def generate(req: GenerateRequest) -> Dict[str, Any]:
         savings_goal["goal_name"] = req.savings_goal_name
     
 
-    plan_fingerprint = {
-        "currency": req.currency,
-        "country": req.country,
-        "mode": req.budget_mode,
-        "income": req.monthly_income,
-        "fixed": req.fixed_expenses,
-        "variable": variable_total,
-        "debt": req.debt_monthly_payment,
-        "savings": req.savings_monthly,
-        "savings_total": req.savings_total,
-        "goal_cost": req.savings_goal_cost,
-    }
-    plan_id = hashlib.sha256(json.dumps(plan_fingerprint, sort_keys=True).encode("utf-8")).hexdigest()[:16]
 
-    llm_input = {
+    # Prompt size: the model only gets the largest categories (the plan keeps the full list
+    # for /chat), no ASCII bars, and cents-rounded floats
+    llm_breakdown = breakdown
+    if len(breakdown) > LLM_BREAKDOWN_MAX_ITEMS:
+        llm_breakdown = heapq.nlargest(LLM_BREAKDOWN_MAX_ITEMS, breakdown, key=itemgetter("amount"))
+
+    llm_input = round_floats({
         "plan_id": plan_id,
         "currency": req.currency,
         "region": region,
@@ -407,21 +543,18 @@ async def generate(req: GenerateRequest) -> Dict[str, Any]:
         "budget_mode": req.budget_mode,
         "spending_patterns": {
             "variable_total": variable_total,
-            "breakdown": [v.dict() for v in req.variable_breakdown],
+            "breakdown": llm_breakdown,
         },
         "investing": {
             "readiness": readiness,
             "education": education,
             "allocation_example": allocation,
-            "allocation_visual": allocation_visual,
             "education_only": True,
         },
         "savings_goal": savings_goal,
-    }
+    })
 
-    explanation = get_llm_explanation(llm_input)
-
-    return {
+    plan = {
         "plan_id": plan_id,
         "score": score_obj,
         "budget": budget_obj,
@@ -432,28 +565,106 @@ async def generate(req: GenerateRequest) -> Dict[str, Any]:
             "allocation_example": allocation,
             "allocation_visual": allocation_visual,
         },
+        # Sent back by the client on /chat; breakdown_text is formatted once here, not per turn
+        "spending_patterns": {
+            "variable_total": variable_total,
+            "breakdown": breakdown,
+            "breakdown_text": format_breakdown_text(breakdown),
+        },
         "savings_goal": savings_goal,
-        "llm_explanation": explanation,
     }
+    _plan_cache.set(plan_id, (plan, llm_input))
+    return plan, llm_input
+
+
+def json_response(content: Any) -> Response:
+    """
+    JSON response encoded with orjson in one pass (no jsonable_encoder / response-model
+    re-validation of the plan dict we just built).
+    """
+    return Response(orjson.dumps(content), media_type="application/json")
+
+
+def sse_event(event: str, data: Any) -> str:
+    """
+    One Server-Sent Event. Data is JSON-encoded, so newlines inside LLM text can't break framing.
+    """
+    return f"event: {event}\ndata: {orjson.dumps(data).decode()}\n\n"
 
 
 # ------------------------------------------------------------
-# Endpoint: chat
+# Endpoint: generate
 # ------------------------------------------------------------
-@app.post("/chat")
-async def chat(payload: Dict[str, Any]) -> Dict[str, str]:
-    user_msg = (payload.get("message") or "").strip()
-    financial_data = payload.get("financial_data") or {}
-    history = payload.get("history", [])
-    incoming_plan_id = payload.get("plan_id")
-
-    if not user_msg:
-        return {"response": "Please enter a message."}
+@app.post("/generate", response_model=Dict[str, Any])
+async def generate(req: GenerateRequest) -> Response:
+    plan, llm_input = build_plan(req)
+    explanation = await get_llm_explanation(llm_input, cache_key=plan["plan_id"])
+    return json_response({**plan, "llm_explanation": explanation})
+
+
+# Upper bounds for /generate/batch: plans per request, and Groq calls in flight
+# across all batch requests (keep below the account's requests-per-minute tier)
+BATCH_MAX_PLANS = 10
+_batch_llm_slots = asyncio.Semaphore(int(os.getenv("LLM_BATCH_CONCURRENCY", "8")))
+
+
+async def _limited_explanation(plan_id: str, llm_input: Dict[str, Any]) -> str:
+    async with _batch_llm_slots:
+        return await get_llm_explanation(llm_input, cache_key=plan_id)
+
+
+@app.post("/generate/batch", response_model=List[Dict[str, Any]])
+async def generate_batch(
+    reqs: List[GenerateRequest] = Body(..., min_length=1, max_length=BATCH_MAX_PLANS),
+) -> Response:
+    """
+    Several /generate plans in one call (e.g. super / normal / relaxed side by side).
+    Explanations are requested concurrently; results keep the request order.
+    Rate-limit (429) retries with backoff are handled by the Groq client.
+    """
+    built = [build_plan(req) for req in reqs]
+    explanations = await asyncio.gather(*(_limited_explanation(plan["plan_id"], llm_input) for plan, llm_input in built))
+    return json_response([
+        {**plan, "llm_explanation": explanation} for (plan, _), explanation in zip(built, explanations)
+    ])
+
+
+@app.post("/generate/stream")
+async def generate_stream(req: GenerateRequest) -> StreamingResponse:
+    """
+    Same plan as /generate, streamed as SSE:
+      - "plan":  score / budget / investing / savings_goal (render immediately)
+      - "token": explanation text chunks as Groq produces them
+      - "done":  end of stream
+    """
+    plan, llm_input = build_plan(req)
+
+    async def events():
+        yield sse_event("plan", plan)
+        async for chunk in stream_llm_explanation(llm_input, cache_key=plan["plan_id"]):
+            yield sse_event("token", chunk)
+        yield sse_event("done", {"plan_id": plan["plan_id"]})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-    # Keep model away from ASCII bar + big blobs
-    fd = strip_visual_from_financial_data(financial_data)
 
-    # Building a SMALL, SAFE context the model can’t “template hallucinate” from
+# ------------------------------------------------------------
+# Endpoint: chat
+# ------------------------------------------------------------
+def build_chat_context(req: ChatRequest) -> Dict[str, Any]:
+    """
+    SMALL, SAFE LLM context for a chat turn, built from the plan the client sends back.
+    """
+    fd = req.financial_data or {}
+    incoming_plan_id = req.plan_id
+
+    # Building a SMALL, SAFE context the model can’t “template hallucinate” from.
+    # Fields are picked individually, so the ASCII bar (allocation_visual) and other
+    # big blobs never reach the model and the plan doesn't need a stripped copy first.
     budget = (fd.get("budget") or {})
     totals = (budget.get("totals") or {})
     deltas = (budget.get("deltas") or {})
@@ -465,19 +676,16 @@ async def chat(payload: Dict[str, Any]) -> Dict[str, str]:
     spending_patterns = fd.get("spending_patterns") or {}
     breakdown = spending_patterns.get("breakdown") or []
 
-    # Providing a preformatted breakdown string (model should copy this)
-    breakdown_lines = []
-    for item in breakdown:
-        name = (item.get("name") or "").strip()
-        amt = item.get("amount")
-        if name and isinstance(amt, (int, float)):
-            breakdown_lines.append(f"- {name}: {amt}")
-    spending_breakdown_text = "\n".join(breakdown_lines)
+    # Providing a preformatted breakdown string (model should copy this).
+    # Plans from /generate carry it already; only older clients' data needs formatting here.
+    spending_breakdown_text = spending_patterns.get("breakdown_text")
+    if not isinstance(spending_breakdown_text, str):
+        spending_breakdown_text = format_breakdown_text(breakdown)
 
     context = {
         "plan_id": incoming_plan_id,
         "currency": fd.get("currency"),
-        "region": fd.get("investing", {}).get("region"),
+        "region": investing.get("region"),
         "budget_totals": totals,
         "budget_deltas": deltas,
         "investing": {
@@ -492,6 +700,36 @@ async def chat(payload: Dict[str, Any]) -> Dict[str, str]:
         },
         "savings_goal": fd.get("savings_goal"),
     }
+    return context
+
 
-    response_text = chat_freeform(user_msg, context=context)
-    return {"response": response_text}
+@app.post("/chat", response_model=Dict[str, str])
+async def chat(req: ChatRequest) -> Response:
+    user_msg = (req.message or "").strip()
+    if not user_msg:
+        return json_response({"response": "Please enter a message."})
+
+    response_text = await chat_freeform(user_msg, context=build_chat_context(req))
+    return json_response({"response": response_text})
+
+
+@app.post("/chat/stream")
+async def chat_stream(req: ChatRequest) -> StreamingResponse:
+    """
+    Same as /chat, streamed as SSE: "token" events with reply text chunks, then "done".
+    """
+    user_msg = (req.message or "").strip()
+
+    async def events():
+        if not user_msg:
+            yield sse_event("token", "Please enter a message.")
+        else:
+            async for chunk in stream_chat_freeform(user_msg, context=build_chat_context(req)):
+                yield sse_event("token", chunk)
+        yield sse_event("done", {"plan_id": req.plan_id})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
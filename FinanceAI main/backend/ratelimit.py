@@ -0,0 +1,53 @@
+# backend/ratelimit.py
+import asyncio
+import time
+
+
+class RateLimiter:
+    """
+    Async token bucket for requests per minute and (estimated) tokens per minute.
+
+    A limit of 0 turns that bucket off. acquire() waits until both buckets have room,
+    so bursts queue up here instead of turning into provider-side 429 errors.
+    Waiters are served in arrival order.
+    """
+
+    def __init__(self, rpm: float = 0, tpm: float = 0):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = float(rpm)
+        self._tokens = float(tpm)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        if self.rpm > 0:
+            self._requests = min(float(self.rpm), self._requests + elapsed * self.rpm / 60.0)
+        if self.tpm > 0:
+            self._tokens = min(float(self.tpm), self._tokens + elapsed * self.tpm / 60.0)
+
+    async def acquire(self, tokens: int = 0) -> None:
+        if self.rpm <= 0 and self.tpm <= 0:
+            return
+        # A request larger than the whole bucket still goes through once the bucket is full
+        tokens = min(tokens, self.tpm) if self.tpm > 0 else 0
+
+        # Held while sleeping, so the next waiter only starts counting once this one is served
+        async with self._lock:
+            while True:
+                self._refill()
+                wait = 0.0
+                if self.rpm > 0 and self._requests < 1.0:
+                    wait = (1.0 - self._requests) * 60.0 / self.rpm
+                if tokens and self._tokens < tokens:
+                    wait = max(wait, (tokens - self._tokens) * 60.0 / self.tpm)
+                if wait <= 0.0:
+                    break
+                await asyncio.sleep(wait)
+
+            if self.rpm > 0:
+                self._requests -= 1.0
+            self._tokens -= tokens